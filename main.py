@@ -8,9 +8,16 @@ Permite elegir entre:
 4. MPI (Message Passing Interface)
 """
 
+import importlib
+import multiprocessing
 import subprocess
+import shutil
 import sys
 import os
+import tempfile
+import time
+
+from verification import DEFAULT_VERIFY_REPETITIONS, report_verification
 
 # Configuración del programa (valores por defecto)
 DEFAULT_MATRIX_SIZE = 1000
@@ -19,96 +26,243 @@ DEFAULT_NUM_THREADS = 4
 # Variables globales que se pueden modificar
 MATRIX_SIZE = DEFAULT_MATRIX_SIZE
 NUM_THREADS = DEFAULT_NUM_THREADS
+VERIFY_REPETITIONS = DEFAULT_VERIFY_REPETITIONS
+
+# Estado que se conserva entre acciones del menú
+_backends = {}
+_operands = None
+_operand_files = None
+_process_pool = None
+
+def load_backend(name):
+    """
+    Importa el módulo de un método la primera vez que se usa.
+    Así el menú arranca sin cargar numpy ni mpi4py, y las ejecuciones
+    siguientes reutilizan el módulo ya importado.
+    """
+    if name not in _backends:
+        _backends[name] = importlib.import_module(name)
+    return _backends[name]
+
+def get_operands():
+    """
+    Devuelve las matrices A y B del tamaño configurado.
+    Solo se generan de nuevo si el tamaño de matriz cambió desde la última
+    ejecución, de modo que todos los métodos se comparan con los mismos datos.
+    """
+    global _operands
+    
+    if _operands is None or _operands[0] != MATRIX_SIZE:
+        print(f"Generando matrices aleatorias de {MATRIX_SIZE}x{MATRIX_SIZE}...")
+        sequential = load_backend("sequential")
+        matrix_A = sequential.generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
+        matrix_B = sequential.generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
+        _operands = (MATRIX_SIZE, matrix_A, matrix_B)
+    else:
+        print(f"Reutilizando matrices de {MATRIX_SIZE}x{MATRIX_SIZE} ya generadas.")
+    
+    return _operands[1], _operands[2]
+
+def get_operand_files():
+    """
+    Guarda las matrices actuales en archivos .npy temporales y devuelve sus rutas.
+    Permite que mpi.py lea los mismos datos con MPI-IO en lugar de generarlos
+    de nuevo. Los archivos se reescriben solo si cambió el tamaño de matriz.
+    """
+    global _operand_files
+    
+    matrix_A, matrix_B = get_operands()
+    if _operand_files is None or _operand_files[0] != MATRIX_SIZE:
+        matrix_io = load_backend("matrix_io")
+        directory = _operand_files[1] if _operand_files else tempfile.mkdtemp(prefix="matrices_")
+        path_A = os.path.join(directory, "A.npy")
+        path_B = os.path.join(directory, "B.npy")
+        matrix_io.save_matrix(path_A, matrix_A)
+        matrix_io.save_matrix(path_B, matrix_B)
+        _operand_files = (MATRIX_SIZE, directory, path_A, path_B)
+    
+    return _operand_files[2], _operand_files[3]
+
+def remove_operand_files():
+    """Elimina los archivos temporales de matrices si se crearon."""
+    global _operand_files
+    
+    if _operand_files is not None:
+        shutil.rmtree(_operand_files[1], ignore_errors=True)
+        _operand_files = None
+
+def get_process_pool(matrix_B):
+    """
+    Devuelve un pool de NUM_THREADS procesos que ya tienen la matriz B dada.
+    El pool se mantiene vivo entre ejecuciones y solo se recrea si cambia
+    el número de procesos o la matriz B (se compara el objeto, no el tamaño).
+    """
+    global _process_pool
+    
+    if (_process_pool is None or _process_pool.num_processes != NUM_THREADS
+            or _process_pool.matrix_B is not matrix_B):
+        close_process_pool()
+        multiprocess = load_backend("multiprocess")
+        _process_pool = multiprocess.create_process_pool(matrix_B, NUM_THREADS)
+    
+    return _process_pool
+
+def close_process_pool():
+    """Cierra el pool de procesos si hay uno activo."""
+    global _process_pool
+    
+    if _process_pool is not None:
+        _process_pool.close()
+        _process_pool.join()
+        _process_pool = None
+
+def verify_args():
+    """Devuelve los argumentos de verificación a pasar a mpi.py."""
+    if VERIFY_REPETITIONS > 0:
+        return [f"--verify={VERIFY_REPETITIONS}"]
+    return []
+
+def verify_description():
+    """Describe la configuración actual de verificación."""
+    if VERIFY_REPETITIONS > 0:
+        return f"Freivalds, {VERIFY_REPETITIONS} repeticiones"
+    return "desactivada"
+
+def timed_run(description, multiply, A, B):
+    """
+    Ejecuta una multiplicación dentro del mismo proceso, mide su tiempo
+    y, si está activada, verifica el resultado por separado.
+    """
+    try:
+        print(f"Iniciando multiplicación {description}...")
+        
+        # Medir el tiempo de ejecución
+        start_time = time.time()
+        result_matrix = multiply()
+        end_time = time.time()
+        
+        print(f"La multiplicación {description} ha finalizado.")
+        print(f"Tiempo total de ejecución: {end_time - start_time:.4f} segundos.")
+        
+        # Verificar el resultado fuera de la medición de la multiplicación
+        if VERIFY_REPETITIONS:
+            return report_verification(A, B, result_matrix, VERIFY_REPETITIONS)
+        return True
+    except Exception as e:
+        print(f"Error en la multiplicación {description}: {e}")
+        return False
 
 def run_sequential():
-    """Ejecuta el archivo sequential.py directamente."""
+    """Ejecuta la multiplicación secuencial en el mismo proceso."""
     print("=" * 60)
     print("EJECUTANDO MULTIPLICACIÓN SECUENCIAL")
     print("=" * 60)
     print(f"Tamaño de matriz: {MATRIX_SIZE}x{MATRIX_SIZE}")
     
-    try:
-        # Pasar las variables como argumentos de línea de comandos
-        result = subprocess.run([sys.executable, "sequential.py", str(MATRIX_SIZE)], 
-                              capture_output=False, 
-                              text=True, 
-                              cwd=os.path.dirname(os.path.abspath(__file__)))
-        return result.returncode == 0
-    except Exception as e:
-        print(f"Error ejecutando sequential.py: {e}")
-        return False
+    sequential = load_backend("sequential")
+    matrix_A, matrix_B = get_operands()
+    return timed_run("secuencial",
+                     lambda: sequential.sequential_matrix_multiplication(matrix_A, matrix_B),
+                     matrix_A, matrix_B)
 
 def run_threads():
-    """Ejecuta el archivo threads.py directamente."""
+    """Ejecuta la multiplicación con hilos en el mismo proceso."""
     print("=" * 60)
     print("EJECUTANDO MULTIPLICACIÓN CON HILOS")
     print("=" * 60)
     print(f"Tamaño de matriz: {MATRIX_SIZE}x{MATRIX_SIZE}")
     print(f"Número de hilos: {NUM_THREADS}")
     
-    try:
-        # Pasar las variables como argumentos de línea de comandos
-        result = subprocess.run([sys.executable, "threads.py", str(MATRIX_SIZE), str(NUM_THREADS)], 
-                              capture_output=False, 
-                              text=True, 
-                              cwd=os.path.dirname(os.path.abspath(__file__)))
-        return result.returncode == 0
-    except Exception as e:
-        print(f"Error ejecutando threads.py: {e}")
-        return False
+    threads = load_backend("threads")
+    matrix_A, matrix_B = get_operands()
+    return timed_run("paralela por hilos",
+                     lambda: threads.parallel_matrix_multiplication(matrix_A, matrix_B, NUM_THREADS),
+                     matrix_A, matrix_B)
 
 def run_multiprocess():
-    """Ejecuta el archivo multiprocess.py directamente."""
+    """Ejecuta la multiplicación con multiprocessing usando un pool que se mantiene vivo."""
     print("=" * 60)
     print("EJECUTANDO MULTIPLICACIÓN CON MULTIPROCESSING")
     print("=" * 60)
     print(f"Tamaño de matriz: {MATRIX_SIZE}x{MATRIX_SIZE}")
     print(f"Número de procesos: {NUM_THREADS}")
     
+    multiprocess = load_backend("multiprocess")
+    matrix_A, matrix_B = get_operands()
+    pool = get_process_pool(matrix_B)
+    return timed_run("paralela por procesos",
+                     lambda: multiprocess.pooled_matrix_multiplication(matrix_A, pool),
+                     matrix_A, matrix_B)
+
+def run_mpi_single_process(matrix_A, matrix_B, verify_repetitions):
+    """
+    Ejecuta MPI con un solo proceso dentro de un proceso hijo.
+    Así MPI_Init ocurre en el hijo: si MPI falla, solo termina el hijo y no
+    el menú, y el lanzador puede seguir creando pools de procesos sin haber
+    inicializado MPI.
+    """
+    global VERIFY_REPETITIONS
+    
+    # El hijo no hereda la configuración del menú, así que se recibe como argumento
+    VERIFY_REPETITIONS = verify_repetitions
+    
     try:
-        # Pasar las variables como argumentos de línea de comandos
-        result = subprocess.run([sys.executable, "multiprocess.py", str(MATRIX_SIZE), str(NUM_THREADS)], 
-                              capture_output=False, 
-                              text=True, 
-                              cwd=os.path.dirname(os.path.abspath(__file__)))
-        return result.returncode == 0
-    except Exception as e:
-        print(f"Error ejecutando multiprocess.py: {e}")
-        return False
+        mpi = load_backend("mpi")
+    except ImportError as e:
+        print(f"Error importando mpi.py: {e}")
+        sys.exit(1)
+    
+    success = timed_run("MPI",
+                        lambda: mpi.mpi_matrix_multiplication(matrix_A, matrix_B),
+                        matrix_A, matrix_B)
+    sys.exit(0 if success else 1)
 
 def run_mpi():
-    """Ejecuta el archivo mpi.py directamente con mpirun."""
+    """
+    Ejecuta mpi.py con mpirun, que es el único método que necesita procesos
+    externos. Las matrices se le pasan como archivos .npy para que use los
+    mismos datos que los demás métodos. Si mpirun no está disponible, ejecuta
+    MPI con un solo proceso en un proceso hijo.
+    """
     print("=" * 60)
     print("EJECUTANDO MULTIPLICACIÓN CON MPI")
     print("=" * 60)
     print(f"Tamaño de matriz: {MATRIX_SIZE}x{MATRIX_SIZE}")
     print(f"Número de procesos MPI: {NUM_THREADS}")
     
+    if shutil.which("mpirun") is None:
+        print("mpirun no encontrado. Ejecutando MPI con un solo proceso...")
+        matrix_A, matrix_B = get_operands()
+        
+        # Usar spawn para que el hijo no herede el estado del menú ni del pool
+        process = multiprocessing.get_context("spawn").Process(
+            target=run_mpi_single_process,
+            args=(matrix_A, matrix_B, VERIFY_REPETITIONS))
+        process.start()
+        process.join()
+        return process.exitcode == 0
+    
+    # Los archivos de matrices solo se escriben cuando mpirun los va a leer
+    try:
+        path_A, path_B = get_operand_files()
+    except ImportError as e:
+        print(f"Error importando matrix_io.py: {e}")
+        return False
+    
     try:
-        # Intentar ejecutar con mpirun
-        result = subprocess.run(["mpirun", "-n", str(NUM_THREADS), sys.executable, "mpi.py", str(MATRIX_SIZE)], 
+        result = subprocess.run(["mpirun", "-n", str(NUM_THREADS), sys.executable, "mpi.py",
+                                 f"--input-a={path_A}", f"--input-b={path_B}"] + verify_args(), 
                               capture_output=False, 
                               text=True, 
                               cwd=os.path.dirname(os.path.abspath(__file__)))
         return result.returncode == 0
-    except FileNotFoundError:
-        print("mpirun no encontrado. Intentando ejecutar mpi.py directamente...")
-        try:
-            result = subprocess.run([sys.executable, "mpi.py", str(MATRIX_SIZE)], 
-                                  capture_output=False, 
-                                  text=True, 
-                                  cwd=os.path.dirname(os.path.abspath(__file__)))
-            return result.returncode == 0
-        except Exception as e:
-            print(f"Error ejecutando mpi.py: {e}")
-            return False
     except Exception as e:
         print(f"Error ejecutando MPI: {e}")
         return False
 
 def configure_settings():
     """Permite configurar las variables desde la terminal."""
-    global MATRIX_SIZE, NUM_THREADS
+    global MATRIX_SIZE, NUM_THREADS, VERIFY_REPETITIONS
     
     print("\n" + "=" * 60)
     print("CONFIGURACIÓN DE PARÁMETROS")
@@ -116,6 +270,7 @@ def configure_settings():
     print(f"Configuración actual:")
     print(f"- Tamaño de matriz: {MATRIX_SIZE}x{MATRIX_SIZE}")
     print(f"- Número de hilos/procesos: {NUM_THREADS}")
+    print(f"- Verificación del resultado: {verify_description()}")
     print("=" * 60)
     
     while True:
@@ -123,10 +278,11 @@ def configure_settings():
             print("\nOpciones de configuración:")
             print("1. Cambiar tamaño de matriz")
             print("2. Cambiar número de hilos/procesos")
-            print("3. Restaurar valores por defecto")
+            print("3. Cambiar repeticiones de verificación (0 = desactivar)")
+            print("4. Restaurar valores por defecto")
             print("0. Volver al menú principal")
             
-            choice = input("\nSelecciona una opción (0-3): ").strip()
+            choice = input("\nSelecciona una opción (0-4): ").strip()
             
             if choice == '0':
                 break
@@ -145,13 +301,22 @@ def configure_settings():
                 else:
                     print("✗ Error: Debe ser un número entero positivo")
             elif choice == '3':
+                new_reps = input(f"Ingresa el número de repeticiones de verificación (actual: {VERIFY_REPETITIONS}): ").strip()
+                if new_reps.isdigit():
+                    VERIFY_REPETITIONS = int(new_reps)
+                    print(f"✓ Verificación del resultado: {verify_description()}")
+                else:
+                    print("✗ Error: Debe ser un número entero no negativo")
+            elif choice == '4':
                 MATRIX_SIZE = DEFAULT_MATRIX_SIZE
                 NUM_THREADS = DEFAULT_NUM_THREADS
+                VERIFY_REPETITIONS = DEFAULT_VERIFY_REPETITIONS
                 print(f"✓ Valores restaurados a los por defecto:")
                 print(f"  - Tamaño de matriz: {MATRIX_SIZE}x{MATRIX_SIZE}")
                 print(f"  - Número de hilos/procesos: {NUM_THREADS}")
+                print(f"  - Verificación del resultado: {verify_description()}")
             else:
-                print("✗ Opción inválida. Por favor, selecciona un número del 0 al 3.")
+                print("✗ Opción inválida. Por favor, selecciona un número del 0 al 4.")
                 
         except KeyboardInterrupt:
             print("\n\nVolviendo al menú principal...")
@@ -179,6 +344,7 @@ def main():
     print(f"Configuración actual:")
     print(f"- Tamaño de matriz: {MATRIX_SIZE}x{MATRIX_SIZE}")
     print(f"- Número de hilos/procesos: {NUM_THREADS}")
+    print(f"- Verificación del resultado: {verify_description()}")
     
     while True:
         show_menu()
@@ -220,4 +386,9 @@ def main():
         input("\nPresiona Enter para continuar...")
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        # Terminar los procesos del pool y borrar los archivos temporales
+        close_process_pool()
+        remove_operand_files()
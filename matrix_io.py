@@ -0,0 +1,228 @@
+import io
+import os
+import numpy as np
+
+# Configuración de lectura/escritura (valores por defecto)
+DEFAULT_CHUNK_ROWS = 256
+MATRIX_DTYPE = np.dtype('<f8')
+
+
+def is_npy_file(path):
+    """Indica si la ruta corresponde a un archivo .npy (si no, se trata como binario crudo)."""
+    return path.lower().endswith(".npy")
+
+
+def read_matrix_header(path, shape=None):
+    """
+    Lee solo los metadatos de una matriz guardada en disco, sin cargar los datos.
+    Los archivos .npy se describen por su cabecera. Los binarios crudos contienen
+    solo valores float64 little-endian por filas; si no se indica shape, se asume
+    una matriz cuadrada y se deduce su tamaño del tamaño del archivo.
+
+    Args:
+        path: Ruta del archivo.
+        shape: Forma (filas, columnas) para binarios crudos. Se ignora en .npy.
+
+    Returns:
+        Tupla (forma, dtype, desplazamiento en bytes donde empiezan los datos).
+    """
+    if is_npy_file(path):
+        with open(path, "rb") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                file_shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                file_shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+
+        if len(file_shape) != 2:
+            raise ValueError(f"{path}: se esperaba una matriz de 2 dimensiones, no {len(file_shape)}.")
+        if fortran_order:
+            raise ValueError(f"{path}: no se pueden leer por filas matrices guardadas en orden Fortran.")
+        if dtype.hasobject:
+            raise ValueError(f"{path}: no se pueden leer matrices con objetos de Python.")
+
+        data_size = os.path.getsize(path) - offset
+        if file_shape[0] * file_shape[1] * dtype.itemsize != data_size:
+            raise ValueError(f"{path}: el archivo tiene {data_size} bytes de datos y su cabecera "
+                             f"indica una matriz {dtype} de {file_shape[0]}x{file_shape[1]}.")
+        return file_shape, dtype, offset
+
+    data_size = os.path.getsize(path)
+    num_values = data_size // MATRIX_DTYPE.itemsize
+    if shape is None:
+        side = int(round(num_values ** 0.5))
+        shape = (side, side)
+    if shape[0] * shape[1] * MATRIX_DTYPE.itemsize != data_size:
+        raise ValueError(f"{path}: el tamaño del archivo ({data_size} bytes) no corresponde "
+                         f"a una matriz float64 de {shape[0]}x{shape[1]}.")
+    return tuple(shape), MATRIX_DTYPE, 0
+
+
+def check_output_shape(path, shape):
+    """
+    Comprueba que una matriz de la forma dada se pueda guardar en path y volver
+    a leer. Los binarios crudos no guardan su forma, así que solo admiten
+    matrices cuadradas; para otras formas hay que usar .npy.
+    """
+    if not is_npy_file(path) and shape[0] != shape[1]:
+        raise ValueError(f"{path}: los binarios crudos solo admiten matrices cuadradas "
+                         f"(el resultado es de {shape[0]}x{shape[1]}); usa un archivo .npy.")
+
+
+def iter_row_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS, shape=None):
+    """
+    Recorre una matriz en disco por bloques de chunk_rows filas.
+    Solo un bloque está en memoria a la vez además de lo que conserve el llamador.
+    """
+    (rows, cols), dtype, offset = read_matrix_header(path, shape)
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for start_row in range(0, rows, chunk_rows):
+            block_rows = min(chunk_rows, rows - start_row)
+            data = np.fromfile(f, dtype=dtype, count=block_rows * cols)
+            yield data.reshape(block_rows, cols).astype(np.float64, copy=False)
+
+
+def load_matrix(path, shape=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Carga una matriz .npy o binaria cruda como lista de listas, el formato que
+    usan las funciones de multiplicación. La conversión se hace por bloques para
+    no duplicar en memoria la matriz completa como array de NumPy.
+    """
+    matrix = []
+    for block in iter_row_chunks(path, chunk_rows, shape):
+        matrix.extend(block.tolist())
+    return matrix
+
+
+def npy_header(shape):
+    """Devuelve los bytes de la cabecera .npy para una matriz float64 de la forma dada."""
+    header = io.BytesIO()
+    np.lib.format.write_array_header_1_0(header, {
+        "descr": np.lib.format.dtype_to_descr(MATRIX_DTYPE),
+        "fortran_order": False,
+        "shape": tuple(shape),
+    })
+    return header.getvalue()
+
+
+def save_matrix(path, matrix, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Guarda una matriz (lista de listas o array de NumPy) en formato .npy o
+    binario crudo según la extensión, escribiendo por bloques de filas.
+    """
+    rows = len(matrix)
+    cols = len(matrix[0]) if rows > 0 else 0
+    check_output_shape(path, (rows, cols))
+
+    with open(path, "wb") as f:
+        if is_npy_file(path):
+            f.write(npy_header((rows, cols)))
+        for start_row in range(0, rows, chunk_rows):
+            block = np.asarray(matrix[start_row:start_row + chunk_rows], dtype=MATRIX_DTYPE)
+            block.tofile(f)
+
+
+def read_rows_mpi(comm, path, start_row, end_row, shape=None):
+    """
+    Lectura colectiva con MPI-IO: cada proceso lee sus filas [start_row, end_row)
+    directamente del archivo con File.Read_at_all, sin pasar por el proceso 0.
+    Todos los procesos del comunicador deben llamar a esta función.
+    """
+    from mpi4py import MPI
+
+    (rows, cols), dtype, offset = read_matrix_header(path, shape)
+
+    # Leer los bytes tal como están en el archivo y convertirlos a float64 después,
+    # igual que load_matrix, para aceptar los mismos tipos de datos
+    raw = np.empty((end_row - start_row) * cols * dtype.itemsize, dtype=np.uint8)
+    status = MPI.Status()
+    fh = MPI.File.Open(comm, path, MPI.MODE_RDONLY)
+    try:
+        fh.Read_at_all(offset + start_row * cols * dtype.itemsize, raw, status)
+    finally:
+        fh.Close()
+
+    # Comprobar en todos los procesos que cada uno leyó su bloque completo
+    if not comm.allreduce(status.Get_count(MPI.BYTE) == raw.size, op=MPI.LAND):
+        raise ValueError(f"{path}: la lectura con MPI-IO devolvió menos datos de los esperados.")
+    # Si el archivo ya es float64 little-endian, se devuelve el mismo buffer sin copiarlo
+    return raw.view(dtype).reshape(end_row - start_row, cols).astype(MATRIX_DTYPE, copy=False)
+
+
+def write_rows_mpi(comm, path, local_rows, start_row, shape):
+    """
+    Escritura colectiva con MPI-IO: cada proceso escribe sus filas en su
+    posición del archivo con File.Write_at_all. El proceso 0 escribe además la
+    cabecera si el archivo es .npy. Todos los procesos deben llamar a esta función.
+    """
+    from mpi4py import MPI
+
+    rows, cols = shape
+    check_output_shape(path, shape)
+    header = npy_header(shape) if is_npy_file(path) else b""
+    local_rows = np.ascontiguousarray(local_rows, dtype=MATRIX_DTYPE)
+
+    fh = MPI.File.Open(comm, path, MPI.MODE_WRONLY | MPI.MODE_CREATE)
+    try:
+        # Ajustar el tamaño por si el archivo ya existía y era más grande
+        fh.Set_size(len(header) + rows * cols * MATRIX_DTYPE.itemsize)
+        if comm.Get_rank() == 0 and header:
+            fh.Write_at(0, header)
+        fh.Write_at_all(len(header) + start_row * cols * MATRIX_DTYPE.itemsize, local_rows)
+    finally:
+        fh.Close()
+
+
+def parse_io_args(argv):
+    """
+    Extrae las opciones --input-a=RUTA, --input-b=RUTA y --output=RUTA de los
+    argumentos de línea de comandos.
+
+    Returns:
+        Tupla (argumentos restantes, diccionario con las claves "a", "b" y "output").
+        Las rutas que no se indicaron valen None.
+    """
+    options = {"--input-a=": "a", "--input-b=": "b", "--output=": "output"}
+    paths = {"a": None, "b": None, "output": None}
+    remaining = []
+    for arg in argv:
+        for prefix, key in options.items():
+            if arg.startswith(prefix):
+                paths[key] = arg[len(prefix):]
+                break
+        else:
+            remaining.append(arg)
+    return remaining, paths
+
+
+def load_operands(paths, size, generate_random_matrix):
+    """
+    Carga las matrices A y B desde las rutas indicadas o, si no se indicó
+    ninguna, las genera aleatoriamente con el tamaño dado. Si hay archivo de
+    salida, comprueba antes de multiplicar que el resultado se podrá guardar.
+
+    Raises:
+        ValueError: Si solo se indicó una de las dos matrices, si los archivos
+            no son válidos o compatibles, o si el resultado no se puede guardar.
+    """
+    if bool(paths["a"]) != bool(paths["b"]):
+        raise ValueError("Hay que indicar ambas matrices (--input-a y --input-b).")
+
+    operands = []
+    for key in ("a", "b"):
+        if paths[key]:
+            print(f"Cargando matriz {key.upper()} desde {paths[key]}...")
+            operands.append(load_matrix(paths[key]))
+        else:
+            print(f"Generando matriz {key.upper()} aleatoria de {size}x{size}...")
+            operands.append(generate_random_matrix(size, size))
+
+    if len(operands[0][0]) != len(operands[1]):
+        raise ValueError("Las dimensiones de las matrices no son compatibles para la multiplicación.")
+
+    if paths["output"]:
+        check_output_shape(paths["output"], (len(operands[0]), len(operands[1][0])))
+    return operands[0], operands[1]
@@ -2,19 +2,65 @@ import random
 import time
 import numpy as np
 
+from verification import VerificationError, DEFAULT_RELATIVE_TOLERANCE
+from matrix_io import DEFAULT_CHUNK_ROWS, check_output_shape, read_matrix_header, read_rows_mpi, write_rows_mpi
+
 # Configuración del programa (valor por defecto)
 DEFAULT_MATRIX_SIZE = 1000
 
-def mpi_matrix_multiplication(A, B):
+def get_row_range(rank, size, rows):
+    """
+    Calcula el rango de filas [start_row, end_row) asignado a un proceso.
+    Los primeros rows % size procesos reciben una fila extra.
+    """
+    rows_per_process = rows // size
+    remaining_rows = rows % size
+    
+    if rank < remaining_rows:
+        start_row = rank * (rows_per_process + 1)
+        end_row = start_row + rows_per_process + 1
+    else:
+        start_row = rank * rows_per_process + remaining_rows
+        end_row = start_row + rows_per_process
+    
+    return start_row, end_row
+
+def multiply_rows(A_rows, B_np):
+    """Multiplica un bloque de filas de A por la matriz B completa."""
+    cols_A = B_np.shape[0]
+    cols_B = B_np.shape[1]
+    local_result = np.zeros((len(A_rows), cols_B), dtype=np.float64)
+    
+    for i in range(len(A_rows)):
+        for j in range(cols_B):
+            dot_product = 0
+            for k in range(cols_A):
+                dot_product += A_rows[i][k] * B_np[k][j]
+            local_result[i][j] = dot_product
+    
+    return local_result
+
+def mpi_matrix_multiplication(A, B, verify=0, output_path=None, gather=True, timings=None):
     """
     Realiza la multiplicación de dos matrices usando MPI.
     
     Args:
         A: Primera matriz (m x n)
         B: Segunda matriz (n x p)
+        verify: Repeticiones de la verificación de Freivalds. Si es 0, no se verifica.
+        output_path: Archivo donde guardar el resultado con MPI-IO. Si es None, no se guarda.
+        gather: Si es True, reúne la matriz completa en el proceso 0. Si es False,
+            cada proceso devuelve solo su bloque de filas.
+        timings: Diccionario opcional donde se guarda el tiempo en segundos de cada
+            etapa ("multiplicacion", "escritura" y "verificacion").
     
     Returns:
-        Matriz resultado C (m x p)
+        Con gather=True, la matriz resultado C (m x p) como lista de listas en el
+        proceso 0 y None en los demás. Con gather=False, el bloque de filas de C
+        calculado por cada proceso.
+    
+    Raises:
+        VerificationError: Si verify > 0 y el resultado no supera la verificación (en todos los procesos).
     """
     try:
         from mpi4py import MPI
@@ -45,27 +91,14 @@ def mpi_matrix_multiplication(A, B):
     B_np = np.array(B, dtype=np.float64)
     
     # Distribuir las filas de A entre los procesos
-    rows_per_process = rows_A // size
-    remaining_rows = rows_A % size
-    
-    # Calcular el rango de filas para este proceso
-    if rank < remaining_rows:
-        start_row = rank * (rows_per_process + 1)
-        end_row = start_row + rows_per_process + 1
-    else:
-        start_row = rank * rows_per_process + remaining_rows
-        end_row = start_row + rows_per_process
+    start_row, end_row = get_row_range(rank, size, rows_A)
     
-    # Cada proceso calcula su parte de la matriz resultado
-    local_result = np.zeros((end_row - start_row, cols_B), dtype=np.float64)
+    # Cada proceso calcula, guarda y verifica su parte de la matriz resultado
+    local_result = multiply_distributed(comm, A_np[start_row:end_row], B_np, start_row, rows_A,
+                                        output_path, verify, timings)
     
-    # Multiplicación local
-    for i in range(start_row, end_row):
-        for j in range(cols_B):
-            dot_product = 0
-            for k in range(cols_A):
-                dot_product += A_np[i][k] * B_np[k][j]
-            local_result[i - start_row][j] = dot_product
+    if not gather:
+        return local_result
     
     # Recopilar resultados en el proceso 0
     if rank == 0:
@@ -78,12 +111,7 @@ def mpi_matrix_multiplication(A, B):
         # Recibir resultados de otros procesos
         for source_rank in range(1, size):
             # Calcular rango de filas del proceso fuente
-            if source_rank < remaining_rows:
-                source_start = source_rank * (rows_per_process + 1)
-                source_end = source_start + rows_per_process + 1
-            else:
-                source_start = source_rank * rows_per_process + remaining_rows
-                source_end = source_start + rows_per_process
+            source_start, source_end = get_row_range(source_rank, size, rows_A)
             
             # Recibir datos del proceso fuente
             source_data = np.zeros((source_end - source_start, cols_B), dtype=np.float64)
@@ -99,6 +127,160 @@ def mpi_matrix_multiplication(A, B):
         comm.Send(local_result, dest=0, tag=0)
         return None
 
+def read_operands_mpi(comm, path_A, path_B):
+    """
+    Lee las matrices de entrada directamente desde disco con MPI-IO.
+    Cada proceso lee solo su bloque de filas de A y todos leen B en paralelo,
+    sin que el proceso 0 tenga que leer y repartir los datos.
+    
+    Returns:
+        Tupla (bloque de filas de A, B, fila inicial del bloque, filas totales de A).
+    """
+    (rows_A, cols_A), _, _ = read_matrix_header(path_A)
+    (rows_B, cols_B), _, _ = read_matrix_header(path_B)
+    
+    if cols_A != rows_B:
+        raise ValueError("Las dimensiones de las matrices no son compatibles para la multiplicación.")
+    
+    start_row, end_row = get_row_range(comm.Get_rank(), comm.Get_size(), rows_A)
+    A_local = read_rows_mpi(comm, path_A, start_row, end_row)
+    B_np = read_rows_mpi(comm, path_B, 0, rows_B)
+    return A_local, B_np, start_row, rows_A
+
+def abs_matvec(M, x, block_rows=DEFAULT_CHUNK_ROWS):
+    """Calcula |M|·x por bloques de filas, sin crear una copia completa de |M|."""
+    result = np.empty(M.shape[0], dtype=np.float64)
+    for start_row in range(0, M.shape[0], block_rows):
+        end_row = start_row + block_rows
+        result[start_row:end_row] = np.abs(M[start_row:end_row]) @ x
+    return result
+
+def distributed_freivalds_check(comm, A_local, B_np, C_local, start_row, rows_A, repetitions,
+                                rel_tol=DEFAULT_RELATIVE_TOLERANCE):
+    """
+    Verificación de Freivalds global para un resultado repartido entre procesos MPI.
+    Primero comprueba que los bloques de filas de todos los procesos cubran
+    exactamente [0, rows_A), sin huecos ni solapamientos. Después, en cada
+    repetición el proceso 0 elige un vector r común, cada proceso calcula sus
+    filas de A·(B·r) y C·r, y el proceso 0 las reúne y compara la matriz completa.
+    
+    Returns:
+        True en todos los procesos si el resultado supera la verificación.
+    """
+    from mpi4py import MPI
+    
+    rank = comm.Get_rank()
+    end_row = start_row + len(C_local)
+    
+    # Comprobar que los rangos de filas de todos los procesos forman una partición exacta
+    ranges = sorted(comm.allgather((start_row, end_row, len(A_local))))
+    next_row = 0
+    for range_start, range_end, a_rows in ranges:
+        if range_start != next_row or range_end < range_start or a_rows != range_end - range_start:
+            return False
+        next_row = range_end
+    if next_row != rows_A:
+        return False
+    
+    for _ in range(repetitions):
+        r = np.random.randint(0, 2, B_np.shape[1]).astype(np.float64) if rank == 0 else None
+        r = comm.bcast(r, root=0)
+        
+        # Filas propias de A·(B·r), de su cota |A|·(|B|·r) y de C·r
+        local_vectors = np.zeros((3, rows_A), dtype=np.float64)
+        local_vectors[0, start_row:end_row] = A_local @ (B_np @ r)
+        local_vectors[1, start_row:end_row] = abs_matvec(A_local, abs_matvec(B_np, r))
+        local_vectors[2, start_row:end_row] = C_local @ r
+        
+        vectors = np.zeros((3, rows_A), dtype=np.float64) if rank == 0 else None
+        comm.Reduce(local_vectors, vectors, op=MPI.SUM, root=0)
+        
+        correct = None
+        if rank == 0:
+            expected, scale, actual = vectors
+            # Comparar con <= para que un NaN o infinito en C haga fallar la verificación
+            correct = bool(np.all(np.abs(expected - actual) <= rel_tol * scale))
+        if not comm.bcast(correct, root=0):
+            return False
+    
+    return True
+
+def multiply_distributed(comm, A_local, B_np, start_row, rows_A, output_path=None, verify=0, timings=None):
+    """
+    Etapas comunes a las dos variantes MPI una vez que cada proceso tiene su
+    bloque de filas de A y la matriz B: multiplicación, escritura del resultado
+    con MPI-IO y verificación global. Todos los procesos deben llamarla.
+    
+    Returns:
+        Bloque de filas de la matriz resultado calculado por este proceso.
+    """
+    if timings is None:
+        timings = {}
+    
+    # Comprobar antes de multiplicar que el resultado se podrá guardar
+    if output_path:
+        check_output_shape(output_path, (rows_A, B_np.shape[1]))
+    
+    # Medir la multiplicación entre barreras para incluir al proceso más lento
+    comm.Barrier()
+    start_time = time.time()
+    local_result = multiply_rows(A_local, B_np)
+    comm.Barrier()
+    timings["multiplicacion"] = time.time() - start_time
+    
+    # Cada proceso escribe su bloque de filas del resultado
+    if output_path:
+        start_time = time.time()
+        write_rows_mpi(comm, output_path, local_result, start_row, (rows_A, B_np.shape[1]))
+        timings["escritura"] = time.time() - start_time
+    
+    if verify:
+        start_time = time.time()
+        correct = distributed_freivalds_check(comm, A_local, B_np, local_result, start_row, rows_A, verify)
+        timings["verificacion"] = time.time() - start_time
+        if not correct:
+            raise VerificationError(
+                f"La matriz resultado no superó la verificación de Freivalds ({verify} repeticiones)."
+            )
+    
+    return local_result
+
+def mpi_matrix_multiplication_from_files(path_A, path_B, output_path=None, verify=0, timings=None):
+    """
+    Realiza la multiplicación de dos matrices guardadas en disco usando MPI.
+    La lectura de las entradas y la escritura del resultado se hacen con MPI-IO,
+    de modo que cada proceso lee y escribe su propio bloque de filas en paralelo.
+    
+    Args:
+        path_A: Archivo .npy o binario crudo con la primera matriz (m x n)
+        path_B: Archivo .npy o binario crudo con la segunda matriz (n x p)
+        output_path: Archivo donde guardar el resultado. Si es None, no se guarda.
+        verify: Repeticiones de la verificación de Freivalds. Si es 0, no se verifica.
+        timings: Diccionario opcional donde se guarda el tiempo en segundos de cada
+            etapa ("lectura", "multiplicacion", "escritura" y "verificacion").
+    
+    Returns:
+        Bloque de filas de la matriz resultado calculado por este proceso.
+    
+    Raises:
+        VerificationError: Si verify > 0 y el resultado no supera la verificación (en todos los procesos).
+    """
+    try:
+        from mpi4py import MPI
+    except ImportError:
+        raise ImportError("mpi4py no está instalado. Instálalo con: pip install mpi4py")
+    
+    comm = MPI.COMM_WORLD
+    if timings is None:
+        timings = {}
+    
+    # Cada proceso lee su bloque de filas de A y la matriz B directamente del archivo
+    start_time = time.time()
+    A_local, B_np, start_row, rows_A = read_operands_mpi(comm, path_A, path_B)
+    timings["lectura"] = time.time() - start_time
+    
+    return multiply_distributed(comm, A_local, B_np, start_row, rows_A, output_path, verify, timings)
+
 def generate_random_matrix(rows, cols):
     """Genera una matriz con valores flotantes aleatorios entre 0 y 1."""
     matrix = [[random.random() for _ in range(cols)] for _ in range(rows)]
@@ -106,11 +288,17 @@ def generate_random_matrix(rows, cols):
 
 if __name__ == "__main__":
     import sys
+    from verification import parse_verify_arg
+    from matrix_io import parse_io_args
+    
+    # Separar las opciones --verify[=K], --input-a, --input-b y --output del resto de argumentos
+    args, VERIFY_REPETITIONS = parse_verify_arg(sys.argv[1:])
+    args, IO_PATHS = parse_io_args(args)
     
     # Obtener el tamaño de matriz desde argumentos de línea de comandos
-    if len(sys.argv) > 1:
+    if len(args) > 0:
         try:
-            MATRIX_SIZE = int(sys.argv[1])
+            MATRIX_SIZE = int(args[0])
         except ValueError:
             print("Error: El tamaño de matriz debe ser un número entero.")
             MATRIX_SIZE = DEFAULT_MATRIX_SIZE
@@ -123,35 +311,70 @@ if __name__ == "__main__":
         rank = comm.Get_rank()
         size = comm.Get_size()
         
-        if rank == 0:
-            print(f"Generando matrices aleatorias de {MATRIX_SIZE}x{MATRIX_SIZE}...")
-            print(f"Usando {size} procesos MPI.")
+        if bool(IO_PATHS["a"]) != bool(IO_PATHS["b"]):
+            if rank == 0:
+                print("Error: Con MPI hay que indicar ambas matrices (--input-a y --input-b).")
+            sys.exit(1)
         
-        # Generar matrices solo en el proceso 0
-        if rank == 0:
-            matrix_A = generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
-            matrix_B = generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
-        else:
-            matrix_A = None
-            matrix_B = None
-        
-        # Broadcast de las matrices a todos los procesos
-        matrix_A = comm.bcast(matrix_A, root=0)
-        matrix_B = comm.bcast(matrix_B, root=0)
-        
-        if rank == 0:
-            print("Matrices generadas. Iniciando multiplicación MPI...")
-        
-        # Medir el tiempo de ejecución
-        start_time = time.time()
-        result_matrix = mpi_matrix_multiplication(matrix_A, matrix_B)
-        end_time = time.time()
-        
-        elapsed_time = end_time - start_time
+        timings = {}
+        try:
+            if IO_PATHS["a"]:
+                if rank == 0:
+                    print(f"Leyendo matrices desde {IO_PATHS['a']} y {IO_PATHS['b']} con MPI-IO...")
+                    print(f"Usando {size} procesos MPI.")
+                
+                mpi_matrix_multiplication_from_files(IO_PATHS["a"], IO_PATHS["b"], IO_PATHS["output"],
+                                                     VERIFY_REPETITIONS, timings)
+            else:
+                if rank == 0:
+                    print(f"Generando matrices aleatorias de {MATRIX_SIZE}x{MATRIX_SIZE}...")
+                    print(f"Usando {size} procesos MPI.")
+                
+                # Generar matrices solo en el proceso 0
+                if rank == 0:
+                    matrix_A = generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
+                    matrix_B = generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
+                else:
+                    matrix_A = None
+                    matrix_B = None
+                
+                # Broadcast de las matrices a todos los procesos
+                matrix_A = comm.bcast(matrix_A, root=0)
+                matrix_B = comm.bcast(matrix_B, root=0)
+                
+                if rank == 0:
+                    print("Matrices generadas. Iniciando multiplicación MPI...")
+                
+                # Cada proceso guarda y verifica su bloque, sin reunir el resultado en el proceso 0
+                mpi_matrix_multiplication(matrix_A, matrix_B, VERIFY_REPETITIONS, IO_PATHS["output"],
+                                          gather=False, timings=timings)
+            correct = True
+        except VerificationError:
+            correct = False
+        except (ValueError, OSError, MPI.Exception) as e:
+            # Los errores de archivo, cabecera o forma se detectan igual en todos los procesos
+            if rank == 0:
+                print(f"Error: {e}")
+            sys.exit(1)
         
         if rank == 0:
+            if "lectura" in timings:
+                print(f"Matrices leídas en {timings['lectura']:.4f} segundos.")
             print(f"La multiplicación MPI ha finalizado.")
-            print(f"Tiempo total de ejecución: {elapsed_time:.4f} segundos.")
+            print(f"Tiempo total de ejecución: {timings['multiplicacion']:.4f} segundos.")
+            if IO_PATHS["output"]:
+                print(f"Resultado guardado en {IO_PATHS['output']} en {timings['escritura']:.4f} segundos.")
+            
+            # La verificación se mide por separado de la multiplicación
+            if VERIFY_REPETITIONS:
+                if correct:
+                    print(f"Verificación de Freivalds correcta ({VERIFY_REPETITIONS} repeticiones).")
+                else:
+                    print(f"✗ Error: La matriz resultado no superó la verificación de Freivalds ({VERIFY_REPETITIONS} repeticiones).")
+                print(f"Tiempo de verificación: {timings['verificacion']:.4f} segundos.")
+        
+        if not correct:
+            sys.exit(1)
     
     except ImportError:
         print("Error: mpi4py no está instalado.")
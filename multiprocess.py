@@ -3,6 +3,8 @@ import time
 import multiprocessing
 from multiprocessing import Process, Value, Array
 
+from verification import verify_result
+
 # Configuración del programa (valores por defecto)
 DEFAULT_MATRIX_SIZE = 1000
 DEFAULT_NUM_PROCESSES = 4
@@ -22,7 +24,68 @@ def calculate_rows_worker(start_row, end_row, A, B, result_flat, rows_A, cols_A,
             # Asignar el resultado en la matriz plana
             result_flat[i * cols_B + j] = dot_product
 
-def parallel_matrix_multiplication(A, B, num_processes=None):
+# Matriz B de cada proceso del pool, recibida una sola vez al iniciarlo
+_pool_B = None
+
+def init_pool_worker(B):
+    """Guarda B en el proceso del pool para no reenviarla en cada multiplicación."""
+    global _pool_B
+    _pool_B = B
+
+def calculate_rows_block(A_rows, cols_A, cols_B):
+    """
+    Función worker para un pool de procesos.
+    Recibe solo las filas de A que le corresponden, usa la B guardada por
+    init_pool_worker y devuelve las filas calculadas, en lugar de escribir en
+    un Array compartido.
+    """
+    B = _pool_B
+    block = []
+    for row_A in A_rows:
+        row_C = [0] * cols_B
+        for j in range(cols_B):
+            # Calcular el producto punto para la posición (i, j)
+            dot_product = 0
+            for k in range(cols_A):
+                dot_product += row_A[k] * B[k][j]
+            row_C[j] = dot_product
+        block.append(row_C)
+    return block
+
+def create_process_pool(B, num_processes=None):
+    """
+    Crea un pool de procesos reutilizable entre multiplicaciones por la matriz B.
+    Los procesos se arrancan y reciben B una sola vez, así que las siguientes
+    llamadas a pooled_matrix_multiplication(A, pool) solo envían las filas de A.
+    El pool guarda la B con la que se creó, de modo que no se le puede pasar
+    otra distinta. El llamador es responsable de cerrarlo.
+    """
+    if num_processes is None:
+        num_processes = multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(num_processes, initializer=init_pool_worker, initargs=(B,))
+    pool.matrix_B = B
+    pool.num_processes = num_processes
+    return pool
+
+def split_rows(rows, num_parts):
+    """
+    Divide las filas [0, rows) en num_parts rangos (start_row, end_row) consecutivos.
+    Los primeros rows % num_parts rangos reciben una fila extra.
+    """
+    rows_per_part = rows // num_parts
+    remaining_rows = rows % num_parts
+    
+    ranges = []
+    start_row = 0
+    for part_id in range(num_parts):
+        part_rows = rows_per_part
+        if part_id < remaining_rows:
+            part_rows += 1
+        ranges.append((start_row, start_row + part_rows))
+        start_row += part_rows
+    return ranges
+
+def parallel_matrix_multiplication(A, B, num_processes=None, verify=0):
     """
     Realiza la multiplicación de dos matrices de forma paralela utilizando multiprocessing.
     Divide el trabajo por filas de la matriz resultante.
@@ -31,9 +94,13 @@ def parallel_matrix_multiplication(A, B, num_processes=None):
         A: Primera matriz (m x n)
         B: Segunda matriz (n x p)
         num_processes: Número de procesos a utilizar. Si es None, usa el número de CPUs disponibles.
+        verify: Repeticiones de la verificación de Freivalds. Si es 0, no se verifica.
     
     Returns:
         Matriz resultado C (m x p)
+    
+    Raises:
+        VerificationError: Si verify > 0 y el resultado no supera la verificación.
     """
     # Dimensiones de las matrices
     rows_A = len(A)
@@ -48,31 +115,19 @@ def parallel_matrix_multiplication(A, B, num_processes=None):
     if num_processes is None:
         num_processes = min(multiprocessing.cpu_count(), rows_A)
     
+    # Dividir el trabajo entre procesos
+    row_ranges = split_rows(rows_A, num_processes)
+    
     # Crear matriz resultado como Array compartido para multiprocessing
     result_flat = Array('d', [0] * (rows_A * cols_B))
     
-    # Dividir el trabajo entre procesos
-    rows_per_process = rows_A // num_processes
-    remaining_rows = rows_A % num_processes
-    
     processes = []
-    start_row = 0
-    
-    for process_id in range(num_processes):
-        # Calcular cuántas filas procesará este proceso
-        process_rows = rows_per_process
-        if process_id < remaining_rows:
-            process_rows += 1
-        
-        end_row = start_row + process_rows
-        
+    for start_row, end_row in row_ranges:
         # Crear e iniciar el proceso
         process = Process(target=calculate_rows_worker, 
                         args=(start_row, end_row, A, B, result_flat, rows_A, cols_A, cols_B))
         processes.append(process)
         process.start()
-        
-        start_row = end_row
     
     # Esperar a que todos los procesos terminen
     for process in processes:
@@ -84,6 +139,50 @@ def parallel_matrix_multiplication(A, B, num_processes=None):
         for j in range(cols_B):
             C[i][j] = result_flat[i * cols_B + j]
     
+    # Verificar en el proceso principal, sobre la matriz ya reensamblada
+    if verify:
+        verify_result(A, B, C, verify)
+    
+    return C
+
+def pooled_matrix_multiplication(A, pool, verify=0):
+    """
+    Multiplica A por la matriz B con la que se creó el pool (ver create_process_pool).
+    Divide el trabajo por filas de la matriz resultante entre los procesos del pool.
+    
+    Args:
+        A: Primera matriz (m x n)
+        pool: Pool de procesos creado con create_process_pool(B), con B de (n x p)
+        verify: Repeticiones de la verificación de Freivalds. Si es 0, no se verifica.
+    
+    Returns:
+        Matriz resultado C (m x p)
+    
+    Raises:
+        VerificationError: Si verify > 0 y el resultado no supera la verificación.
+    """
+    B = pool.matrix_B
+    
+    # Dimensiones de las matrices
+    rows_A = len(A)
+    cols_A = len(A[0])
+    rows_B = len(B)
+    cols_B = len(B[0])
+
+    if cols_A != rows_B:
+        raise ValueError("Las dimensiones de las matrices no son compatibles para la multiplicación.")
+    
+    # Repartir los bloques de filas de A entre los procesos ya iniciados del pool
+    row_ranges = split_rows(rows_A, pool.num_processes)
+    tasks = [(A[start_row:end_row], cols_A, cols_B) for start_row, end_row in row_ranges]
+    C = []
+    for block in pool.starmap(calculate_rows_block, tasks):
+        C.extend(block)
+    
+    # Verificar en el proceso principal, sobre la matriz ya reensamblada
+    if verify:
+        verify_result(A, B, C, verify)
+    
     return C
 
 def generate_random_matrix(rows, cols):
@@ -97,10 +196,17 @@ if __name__ == "__main__":
     # Configurar el método de inicio para multiprocessing en Windows
     multiprocessing.set_start_method('spawn', force=True)
     
+    from verification import parse_verify_arg, report_verification
+    from matrix_io import parse_io_args, load_operands, save_matrix
+    
+    # Separar las opciones --verify[=K], --input-a, --input-b y --output del resto de argumentos
+    args, VERIFY_REPETITIONS = parse_verify_arg(sys.argv[1:])
+    args, IO_PATHS = parse_io_args(args)
+    
     # Obtener el tamaño de matriz desde argumentos de línea de comandos
-    if len(sys.argv) > 1:
+    if len(args) > 0:
         try:
-            MATRIX_SIZE = int(sys.argv[1])
+            MATRIX_SIZE = int(args[0])
         except ValueError:
             print("Error: El tamaño de matriz debe ser un número entero.")
             MATRIX_SIZE = DEFAULT_MATRIX_SIZE
@@ -108,9 +214,9 @@ if __name__ == "__main__":
         MATRIX_SIZE = DEFAULT_MATRIX_SIZE
     
     # Obtener el número de procesos desde argumentos de línea de comandos
-    if len(sys.argv) > 2:
+    if len(args) > 1:
         try:
-            NUM_PROCESSES = int(sys.argv[2])
+            NUM_PROCESSES = int(args[1])
         except ValueError:
             print("Error: El número de procesos debe ser un número entero.")
             NUM_PROCESSES = DEFAULT_NUM_PROCESSES
@@ -118,13 +224,14 @@ if __name__ == "__main__":
         NUM_PROCESSES = DEFAULT_NUM_PROCESSES
     
     print(f"Usando {NUM_PROCESSES} procesos para la multiplicación paralela.")
-    print(f"Generando matrices aleatorias de {MATRIX_SIZE}x{MATRIX_SIZE}...")
-    
-    # Generar las dos matrices a multiplicar
-    matrix_A = generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
-    matrix_B = generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
+    # Cargar las matrices desde disco o generarlas aleatoriamente
+    try:
+        matrix_A, matrix_B = load_operands(IO_PATHS, MATRIX_SIZE, generate_random_matrix)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
-    print("Matrices generadas. Iniciando multiplicación paralela por procesos...")
+    print("Matrices listas. Iniciando multiplicación paralela por procesos...")
     
     # Medir el tiempo de ejecución
     start_time = time.time()
@@ -137,3 +244,17 @@ if __name__ == "__main__":
     print(f"Tiempo total de ejecución: {elapsed_time:.4f} segundos.")
     print(f"Número de procesos utilizados: {NUM_PROCESSES}")
     print(f"Número de CPUs disponibles: {multiprocessing.cpu_count()}")
+    
+    # Guardar el resultado si se indicó un archivo de salida
+    if IO_PATHS["output"]:
+        try:
+            save_matrix(IO_PATHS["output"], result_matrix)
+        except OSError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Resultado guardado en {IO_PATHS['output']}.")
+    
+    # Verificar el resultado fuera de la medición de la multiplicación
+    if VERIFY_REPETITIONS:
+        if not report_verification(matrix_A, matrix_B, result_matrix, VERIFY_REPETITIONS):
+            sys.exit(1)
@@ -1,13 +1,17 @@
 import random
 import time
 
+from verification import verify_result
+
 # Configuración del programa (valor por defecto)
 DEFAULT_MATRIX_SIZE = 1000
 
-def sequential_matrix_multiplication(A, B):
+def sequential_matrix_multiplication(A, B, verify=0):
     """
     Realiza la multiplicación de dos matrices de forma secuencial.
     Asume que las dimensiones son compatibles para la multiplicación.
+    Si verify es mayor que 0, comprueba el resultado con esa cantidad de
+    repeticiones de Freivalds y lanza VerificationError si no es correcto.
     """
     # Dimensiones de las matrices
     rows_A = len(A)
@@ -30,6 +34,9 @@ def sequential_matrix_multiplication(A, B):
             for k in range(cols_A):
                 C[i][j] += A[i][k] * B[k][j]
     
+    if verify:
+        verify_result(A, B, C, verify)
+    
     return C
 
 def generate_random_matrix(rows, cols):
@@ -39,11 +46,17 @@ def generate_random_matrix(rows, cols):
 
 if __name__ == "__main__":
     import sys
+    from verification import parse_verify_arg, report_verification
+    from matrix_io import parse_io_args, load_operands, save_matrix
+    
+    # Separar las opciones --verify[=K], --input-a, --input-b y --output del resto de argumentos
+    args, VERIFY_REPETITIONS = parse_verify_arg(sys.argv[1:])
+    args, IO_PATHS = parse_io_args(args)
     
     # Obtener el tamaño de matriz desde argumentos de línea de comandos
-    if len(sys.argv) > 1:
+    if len(args) > 0:
         try:
-            MATRIX_SIZE = int(sys.argv[1])
+            MATRIX_SIZE = int(args[0])
         except ValueError:
             print("Error: El tamaño de matriz debe ser un número entero.")
             MATRIX_SIZE = DEFAULT_MATRIX_SIZE
@@ -53,13 +66,14 @@ if __name__ == "__main__":
     # Pueden ajustar este valor si su máquina tiene más o menos recursos.
     # ¡Cuidado con valores muy grandes que puedan colgar su sistema!
     
-    print(f"Generando matrices aleatorias de {MATRIX_SIZE}x{MATRIX_SIZE}...")
-    
-    # Generar las dos matrices a multiplicar
-    matrix_A = generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
-    matrix_B = generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
+    # Cargar las matrices desde disco o generarlas aleatoriamente
+    try:
+        matrix_A, matrix_B = load_operands(IO_PATHS, MATRIX_SIZE, generate_random_matrix)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
-    print("Matrices generadas. Iniciando multiplicación secuencial...")
+    print("Matrices listas. Iniciando multiplicación secuencial...")
     
     # Medir el tiempo de ejecución
     start_time = time.time()
@@ -70,3 +84,17 @@ if __name__ == "__main__":
     
     print(f"La multiplicación secuencial ha finalizado.")
     print(f"Tiempo total de ejecución: {elapsed_time:.4f} segundos.")
+    
+    # Guardar el resultado si se indicó un archivo de salida
+    if IO_PATHS["output"]:
+        try:
+            save_matrix(IO_PATHS["output"], result_matrix)
+        except OSError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Resultado guardado en {IO_PATHS['output']}.")
+    
+    # Verificar el resultado fuera de la medición de la multiplicación
+    if VERIFY_REPETITIONS:
+        if not report_verification(matrix_A, matrix_B, result_matrix, VERIFY_REPETITIONS):
+            sys.exit(1)
@@ -2,11 +2,13 @@ import random
 import time
 import threading
 
+from verification import verify_result
+
 # Configuración del programa (valores por defecto)
 DEFAULT_MATRIX_SIZE = 1000
 DEFAULT_NUM_THREADS = 4
 
-def parallel_matrix_multiplication(A, B, num_threads=None):
+def parallel_matrix_multiplication(A, B, num_threads=None, verify=0):
     """
     Realiza la multiplicación de dos matrices de forma paralela utilizando threading.
     Divide el trabajo por filas de la matriz resultante.
@@ -15,9 +17,13 @@ def parallel_matrix_multiplication(A, B, num_threads=None):
         A: Primera matriz (m x n)
         B: Segunda matriz (n x p)
         num_threads: Número de hilos a utilizar. Si es None, usa el número de CPUs disponibles.
+        verify: Repeticiones de la verificación de Freivalds. Si es 0, no se verifica.
     
     Returns:
         Matriz resultado C (m x p)
+    
+    Raises:
+        VerificationError: Si verify > 0 y el resultado no supera la verificación.
     """
     # Dimensiones de las matrices
     rows_A = len(A)
@@ -76,6 +82,10 @@ def parallel_matrix_multiplication(A, B, num_threads=None):
     for thread in threads:
         thread.join()
     
+    # Verificar el resultado completo una vez que todos los hilos terminaron
+    if verify:
+        verify_result(A, B, C, verify)
+    
     return C
 
 def generate_random_matrix(rows, cols):
@@ -85,11 +95,17 @@ def generate_random_matrix(rows, cols):
 
 if __name__ == "__main__":
     import sys
+    from verification import parse_verify_arg, report_verification
+    from matrix_io import parse_io_args, load_operands, save_matrix
+    
+    # Separar las opciones --verify[=K], --input-a, --input-b y --output del resto de argumentos
+    args, VERIFY_REPETITIONS = parse_verify_arg(sys.argv[1:])
+    args, IO_PATHS = parse_io_args(args)
     
     # Obtener el tamaño de matriz desde argumentos de línea de comandos
-    if len(sys.argv) > 1:
+    if len(args) > 0:
         try:
-            MATRIX_SIZE = int(sys.argv[1])
+            MATRIX_SIZE = int(args[0])
         except ValueError:
             print("Error: El tamaño de matriz debe ser un número entero.")
             MATRIX_SIZE = DEFAULT_MATRIX_SIZE
@@ -99,13 +115,14 @@ if __name__ == "__main__":
     # Pueden ajustar este valor si su máquina tiene más o menos recursos.
     # ¡Cuidado con valores muy grandes que puedan colgar su sistema!
     
-    print(f"Generando matrices aleatorias de {MATRIX_SIZE}x{MATRIX_SIZE}...")
+    # Cargar las matrices desde disco o generarlas aleatoriamente
+    try:
+        matrix_A, matrix_B = load_operands(IO_PATHS, MATRIX_SIZE, generate_random_matrix)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
-    # Generar las dos matrices a multiplicar
-    matrix_A = generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
-    matrix_B = generate_random_matrix(MATRIX_SIZE, MATRIX_SIZE)
-    
-    print("Matrices generadas. Iniciando multiplicación paralela por hilos...")
+    print("Matrices listas. Iniciando multiplicación paralela por hilos...")
     
     # Medir el tiempo de ejecución
     start_time = time.time()
@@ -116,3 +133,17 @@ if __name__ == "__main__":
     
     print(f"La multiplicación paralela por hilos ha finalizado.")
     print(f"Tiempo total de ejecución: {elapsed_time:.4f} segundos.")
+    
+    # Guardar el resultado si se indicó un archivo de salida
+    if IO_PATHS["output"]:
+        try:
+            save_matrix(IO_PATHS["output"], result_matrix)
+        except OSError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Resultado guardado en {IO_PATHS['output']}.")
+    
+    # Verificar el resultado fuera de la medición de la multiplicación
+    if VERIFY_REPETITIONS:
+        if not report_verification(matrix_A, matrix_B, result_matrix, VERIFY_REPETITIONS):
+            sys.exit(1)
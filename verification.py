@@ -0,0 +1,132 @@
+import random
+import time
+
+# Configuración de la verificación (valores por defecto)
+DEFAULT_VERIFY_REPETITIONS = 10
+DEFAULT_RELATIVE_TOLERANCE = 1e-9
+
+
+class VerificationError(Exception):
+    """Se lanza cuando la matriz resultado no supera la verificación de Freivalds."""
+
+
+def freivalds_check(A, B, C, repetitions=DEFAULT_VERIFY_REPETITIONS,
+                    rel_tol=DEFAULT_RELATIVE_TOLERANCE):
+    """
+    Verifica probabilísticamente que C == A x B usando el algoritmo de Freivalds.
+    En cada repetición se elige un vector aleatorio r de ceros y unos y se
+    compara A·(B·r) con C·r, lo que cuesta O(N²) en lugar del O(N³) de
+    recalcular el producto. Si C es incorrecta, cada repetición la detecta con
+    probabilidad de al menos 1/2, así que el error tras k repeticiones es <= 2^-k.
+
+    Args:
+        A: Primera matriz (m x n)
+        B: Segunda matriz (n x p)
+        C: Matriz resultado a verificar (m x p)
+        repetitions: Número de vectores aleatorios a probar.
+        rel_tol: Tolerancia relativa frente al redondeo de punto flotante.
+
+    Returns:
+        True si C supera todas las repeticiones, False en caso contrario.
+    """
+    rows_A = len(A)
+    cols_A = len(A[0])
+    cols_B = len(B[0])
+
+    if len(C) != rows_A or len(C[0]) != cols_B:
+        return False
+
+    for _ in range(repetitions):
+        r = [random.randint(0, 1) for _ in range(cols_B)]
+
+        # B·r y |B|·r en una sola pasada (r es no negativo, así que |r| = r)
+        Br = [0.0] * cols_A
+        abs_Br = [0.0] * cols_A
+        for k in range(cols_A):
+            row = B[k]
+            total = 0.0
+            abs_total = 0.0
+            for j in range(cols_B):
+                if r[j]:
+                    total += row[j]
+                    abs_total += abs(row[j])
+            Br[k] = total
+            abs_Br[k] = abs_total
+
+        for i in range(rows_A):
+            row_A = A[i]
+            row_C = C[i]
+
+            # Fila i de A·(B·r) y su cota de magnitud |A|·(|B|·r)
+            expected = 0.0
+            scale = 0.0
+            for k in range(cols_A):
+                expected += row_A[k] * Br[k]
+                scale += abs(row_A[k]) * abs_Br[k]
+
+            # Fila i de C·r
+            actual = 0.0
+            for j in range(cols_B):
+                if r[j]:
+                    actual += row_C[j]
+
+            # Comparar con <= para que un NaN o infinito en C haga fallar la verificación
+            if not abs(expected - actual) <= rel_tol * scale:
+                return False
+
+    return True
+
+
+def verify_result(A, B, C, repetitions=DEFAULT_VERIFY_REPETITIONS):
+    """Lanza VerificationError si C no supera la verificación de Freivalds."""
+    if repetitions is True:
+        repetitions = DEFAULT_VERIFY_REPETITIONS
+    if not freivalds_check(A, B, C, repetitions):
+        raise VerificationError(
+            f"La matriz resultado no superó la verificación de Freivalds ({repetitions} repeticiones)."
+        )
+
+
+def report_verification(A, B, C, repetitions=DEFAULT_VERIFY_REPETITIONS):
+    """
+    Verifica el resultado desde los scripts, midiendo su tiempo por separado
+    del de la multiplicación e imprimiendo el resultado.
+
+    Returns:
+        True si la verificación fue correcta, False en caso contrario.
+    """
+    start_time = time.time()
+    correct = freivalds_check(A, B, C, repetitions)
+    end_time = time.time()
+
+    if correct:
+        print(f"Verificación de Freivalds correcta ({repetitions} repeticiones).")
+    else:
+        print(f"✗ Error: La matriz resultado no superó la verificación de Freivalds ({repetitions} repeticiones).")
+    print(f"Tiempo de verificación: {end_time - start_time:.4f} segundos.")
+    return correct
+
+
+def parse_verify_arg(argv):
+    """
+    Extrae la opción --verify[=K] de los argumentos de línea de comandos.
+
+    Returns:
+        Tupla (argumentos restantes, repeticiones). Las repeticiones son 0 si
+        la verificación no se solicitó.
+    """
+    remaining = []
+    repetitions = 0
+    for arg in argv:
+        if arg == "--verify":
+            repetitions = DEFAULT_VERIFY_REPETITIONS
+        elif arg.startswith("--verify="):
+            value = arg.split("=", 1)[1]
+            if value.isdigit():
+                repetitions = int(value)
+            else:
+                print("Error: El número de repeticiones de verificación debe ser un número entero.")
+                repetitions = DEFAULT_VERIFY_REPETITIONS
+        else:
+            remaining.append(arg)
+    return remaining, repetitions